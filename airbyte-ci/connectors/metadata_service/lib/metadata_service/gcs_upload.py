@@ -3,19 +3,23 @@
 #
 
 import base64
+import functools
 import hashlib
 import json
 import logging
 import os
 import re
+import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-import git
 import requests
 import yaml
+from google.api_core.exceptions import GoogleAPICallError, NotFound
+from google.auth.exceptions import TransportError as GoogleAuthTransportError
 from google.cloud import storage
 from google.oauth2 import service_account
 from metadata_service.constants import (
@@ -31,9 +35,27 @@ from metadata_service.constants import (
 from metadata_service.models.generated.ConnectorMetadataDefinitionV0 import ConnectorMetadataDefinitionV0
 from metadata_service.models.generated.GitInfo import GitInfo
 from metadata_service.models.transform import to_json_sanitized_dict
-from metadata_service.validators.metadata_validator import POST_UPLOAD_VALIDATORS, ValidatorOptions, validate_and_load
-from pydash import set_
-from pydash.objects import get
+from metadata_service.validators.metadata_validator import POST_UPLOAD_VALIDATORS, ValidatorOptions, validate_and_load_dict
+
+# Use the libyaml C bindings when available, falling back to the pure-Python implementation
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Read files in 1 MiB chunks when hashing them to limit the number of read calls on large files
+HASH_READ_CHUNK_SIZE = 1024 * 1024
+
+_DOCS_URL_RE = re.compile(r"^https://docs\.airbyte\.com/(.+)$")
+
+# Reuse the same connection pool for the SBOM checks of all the connectors uploaded by this process
+_SBOM_SESSION = requests.Session()
+_SBOM_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=32))
+_SBOM_REQUEST_TIMEOUT_SECONDS = 30
+
+# GCS clients keyed by the sha256 of their credentials, so that we don't keep the credentials themselves around
+_STORAGE_CLIENTS: Dict[str, storage.Client] = {}
+
+# Serialized git info keyed by commit sha, as it is the same for all the files modified by a commit
+_GIT_INFO_DICTS: Dict[str, dict] = {}
 
 
 @dataclass(frozen=True)
@@ -88,8 +110,7 @@ def get_doc_remote_file_path(dockerRepository: str, version: str, inapp: bool) -
 
 
 def get_doc_local_file_path(metadata: ConnectorMetadataDefinitionV0, docs_path: Path, inapp: bool) -> Path:
-    pattern = re.compile(r"^https://docs\.airbyte\.com/(.+)$")
-    match = pattern.search(metadata.data.documentationUrl)
+    match = _DOCS_URL_RE.match(metadata.data.documentationUrl)
     if match:
         extension = ".inapp.md" if inapp else ".md"
         return (docs_path / match.group(1)).with_suffix(extension)
@@ -97,9 +118,17 @@ def get_doc_local_file_path(metadata: ConnectorMetadataDefinitionV0, docs_path:
 
 
 def compute_gcs_md5(file_name: str) -> str:
+    # The same local file is compared against several remote blobs (e.g. the versioned and latest metadata),
+    # so the hash is cached as long as the file is not modified
+    file_stat = os.stat(file_name)
+    return _compute_gcs_md5(str(file_name), file_stat.st_mtime_ns, file_stat.st_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _compute_gcs_md5(file_name: str, mtime_ns: int, size: int) -> str:
     hash_md5 = hashlib.md5()
     with open(file_name, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        for chunk in iter(lambda: f.read(HASH_READ_CHUNK_SIZE), b""):
             hash_md5.update(chunk)
 
     return base64.b64encode(hash_md5.digest()).decode("utf8")
@@ -120,17 +149,83 @@ def _save_blob_to_gcs(blob_to_save: storage.blob.Blob, file_path: str, disable_c
     return True
 
 
+def _get_storage_client(gcs_creds: str) -> storage.Client:
+    """Get a GCS client authenticated with the given service account credentials.
+
+    The client, and its connection pool, is reused by all the uploads made with the same credentials in this process.
+    """
+    gcs_creds_sha256 = hashlib.sha256(gcs_creds.encode()).hexdigest()
+    if gcs_creds_sha256 not in _STORAGE_CLIENTS:
+        service_account_info = json.loads(gcs_creds)
+        credentials = service_account.Credentials.from_service_account_info(service_account_info)
+        _STORAGE_CLIENTS[gcs_creds_sha256] = storage.Client(credentials=credentials)
+    return _STORAGE_CLIENTS[gcs_creds_sha256]
+
+
+def _prefetch_remote_blobs(
+    storage_client: storage.Client, bucket: storage.bucket.Bucket, blob_paths: List[str]
+) -> Dict[str, storage.blob.Blob]:
+    """Reload the given blobs in a single batch request to get their md5_hash.
+
+    Blobs that do not exist in the bucket are returned without an md5_hash.
+    Blobs whose reload failed for any other reason are left out, so that upload_file_if_changed reloads them on its own
+    with the default retry policy and raises if the error persists.
+    """
+    remote_blobs = {blob_path: bucket.blob(blob_path) for blob_path in blob_paths}
+
+    # The batch is sent explicitly rather than when leaving its context, to get the response of each reload.
+    # raise_exception=False prevents a blob that does not exist yet from failing the whole batch.
+    batch = storage_client.batch(raise_exception=False)
+    storage_client._push_batch(batch)
+    try:
+        for remote_blob in remote_blobs.values():
+            remote_blob.reload()
+    finally:
+        storage_client._pop_batch()
+
+    try:
+        responses = batch.finish(raise_exception=False)
+    except (GoogleAPICallError, GoogleAuthTransportError, requests.exceptions.RequestException) as e:
+        logging.warning(f"Failed to prefetch the remote blobs, they will be reloaded one by one: {e}")
+        return {}
+
+    # the batch responses are in the same order as the reload requests
+    return {
+        blob_path: remote_blob
+        for (blob_path, remote_blob), response in zip(remote_blobs.items(), responses)
+        if response.status_code == 404 or 200 <= response.status_code < 300
+    }
+
+
 def upload_file_if_changed(
-    local_file_path: Path, bucket: storage.bucket.Bucket, blob_path: str, disable_cache: bool = False
+    local_file_path: Path,
+    bucket: storage.bucket.Bucket,
+    blob_path: str,
+    disable_cache: bool = False,
+    prefetched_blobs: Optional[Dict[str, storage.blob.Blob]] = None,
 ) -> Tuple[bool, str]:
-    local_file_md5_hash = compute_gcs_md5(local_file_path)
-    remote_blob = bucket.blob(blob_path)
-
-    # reload the blob to get the md5_hash
-    if remote_blob.exists():
-        remote_blob.reload()
+    if prefetched_blobs and blob_path in prefetched_blobs:
+        # the blob was already reloaded by _prefetch_remote_blobs
+        remote_blob = prefetched_blobs[blob_path]
+        remote_blob_md5_hash = remote_blob.md5_hash
+    else:
+        remote_blob = bucket.blob(blob_path)
+
+        # reload the blob to get the md5_hash, a blob that does not exist yet fails with NotFound
+        # so we don't need a separate exists() request
+        try:
+            remote_blob.reload()
+            remote_blob_md5_hash = remote_blob.md5_hash
+        except NotFound:
+            remote_blob_md5_hash = None
+
+    # there is nothing to compare the local file to if the remote blob does not exist
+    if remote_blob_md5_hash is None:
+        print(f"Remote {blob_path} does not exist")
+        uploaded = _save_blob_to_gcs(remote_blob, local_file_path, disable_cache=disable_cache)
+        return uploaded, remote_blob.id
 
-    remote_blob_md5_hash = remote_blob.md5_hash if remote_blob.exists() else None
+    local_file_md5_hash = compute_gcs_md5(local_file_path)
 
     print(f"Local {local_file_path} md5_hash: {local_file_md5_hash}")
     print(f"Remote {blob_path} md5_hash: {remote_blob_md5_hash}")
@@ -143,30 +238,54 @@ def upload_file_if_changed(
 
 
 def _metadata_upload(
-    metadata: ConnectorMetadataDefinitionV0, bucket: storage.bucket.Bucket, metadata_file_path: Path, version: str
+    metadata: ConnectorMetadataDefinitionV0,
+    bucket: storage.bucket.Bucket,
+    metadata_file_path: Path,
+    version: str,
+    prefetched_blobs: Optional[Dict[str, storage.blob.Blob]] = None,
 ) -> Tuple[bool, str]:
     latest_path = get_metadata_remote_file_path(metadata.data.dockerRepository, version)
-    return upload_file_if_changed(metadata_file_path, bucket, latest_path, disable_cache=True)
+    return upload_file_if_changed(metadata_file_path, bucket, latest_path, disable_cache=True, prefetched_blobs=prefetched_blobs)
+
+
+def _get_icon_file_paths(metadata: ConnectorMetadataDefinitionV0, icon_file_path: Path) -> Tuple[Path, str]:
+    """Get the local path of the connector icon and the remote path it is uploaded to."""
+    return icon_file_path, get_icon_remote_file_path(metadata.data.dockerRepository, "latest")
+
+
+def _get_doc_file_paths(metadata: ConnectorMetadataDefinitionV0, docs_path: Path, latest: bool, inapp: bool) -> Tuple[Optional[Path], str]:
+    """Get the local path of a connector doc, None if the metadata has no valid documentation url, and the remote path it is uploaded to."""
+    local_doc_path = get_doc_local_file_path(metadata, docs_path, inapp)
+    remote_doc_path = get_doc_remote_file_path(metadata.data.dockerRepository, "latest" if latest else metadata.data.dockerImageTag, inapp)
+    return local_doc_path, remote_doc_path
 
 
-def _icon_upload(metadata: ConnectorMetadataDefinitionV0, bucket: storage.bucket.Bucket, icon_file_path: Path) -> Tuple[bool, str]:
-    latest_icon_path = get_icon_remote_file_path(metadata.data.dockerRepository, "latest")
+def _icon_upload(
+    metadata: ConnectorMetadataDefinitionV0,
+    bucket: storage.bucket.Bucket,
+    icon_file_path: Path,
+    prefetched_blobs: Optional[Dict[str, storage.blob.Blob]] = None,
+) -> Tuple[bool, str]:
+    icon_file_path, latest_icon_path = _get_icon_file_paths(metadata, icon_file_path)
     if not icon_file_path.exists():
         return False, f"No Icon found at {icon_file_path}"
-    return upload_file_if_changed(icon_file_path, bucket, latest_icon_path)
+    return upload_file_if_changed(icon_file_path, bucket, latest_icon_path, prefetched_blobs=prefetched_blobs)
 
 
 def _doc_upload(
-    metadata: ConnectorMetadataDefinitionV0, bucket: storage.bucket.Bucket, docs_path: Path, latest: bool, inapp: bool
+    metadata: ConnectorMetadataDefinitionV0,
+    bucket: storage.bucket.Bucket,
+    docs_path: Path,
+    latest: bool,
+    inapp: bool,
+    prefetched_blobs: Optional[Dict[str, storage.blob.Blob]] = None,
 ) -> Tuple[bool, str]:
-    local_doc_path = get_doc_local_file_path(metadata, docs_path, inapp)
+    local_doc_path, remote_doc_path = _get_doc_file_paths(metadata, docs_path, latest, inapp)
     if not local_doc_path:
         return False, f"Metadata does not contain a valid Airbyte documentation url, skipping doc upload."
 
-    remote_doc_path = get_doc_remote_file_path(metadata.data.dockerRepository, "latest" if latest else metadata.data.dockerImageTag, inapp)
-
     if local_doc_path.exists():
-        doc_uploaded, doc_blob_id = upload_file_if_changed(local_doc_path, bucket, remote_doc_path)
+        doc_uploaded, doc_blob_id = upload_file_if_changed(local_doc_path, bucket, remote_doc_path, prefetched_blobs=prefetched_blobs)
     else:
         if inapp:
             doc_uploaded, doc_blob_id = False, f"No inapp doc found at {local_doc_path}, skipping inapp doc upload."
@@ -176,29 +295,13 @@ def _doc_upload(
     return doc_uploaded, doc_blob_id
 
 
-def _apply_prerelease_overrides(metadata_dict: dict, validator_opts: ValidatorOptions) -> dict:
-    """Apply any prerelease overrides to the metadata file before uploading it to GCS."""
-    if validator_opts.prerelease_tag is None:
-        return metadata_dict
+# Separator of the commit fields in the git log output, it can't appear in any of them
+_GIT_LOG_FIELD_SEPARATOR = "\x00"
 
-    # replace any dockerImageTag references with the actual tag
-    # this includes metadata.data.dockerImageTag, metadata.data.registryOverrides[].dockerImageTag
-    # where registries is a dictionary of registry name to registry object
-    metadata_dict["data"]["dockerImageTag"] = validator_opts.prerelease_tag
-    for registry in get(metadata_dict, "data.registryOverrides", {}).values():
-        if "dockerImageTag" in registry:
-            registry["dockerImageTag"] = validator_opts.prerelease_tag
-
-    return metadata_dict
 
-
-def _commit_to_git_info(commit: git.Commit) -> GitInfo:
-    return GitInfo(
-        commit_sha=commit.hexsha,
-        commit_timestamp=commit.authored_datetime,
-        commit_author=commit.author.name,
-        commit_author_email=commit.author.email,
-    )
+def _run_git_command(working_directory: Path, *args: str) -> str:
+    """Run a git command from the given directory and return its output."""
+    return subprocess.run(["git", "-C", str(working_directory), *args], capture_output=True, text=True, check=True).stdout
 
 
 def _get_git_info_for_file(original_metadata_file_path: Path) -> Optional[GitInfo]:
@@ -208,57 +311,65 @@ def _get_git_info_for_file(original_metadata_file_path: Path) -> Optional[GitInf
     e.g. The git commit hash, the date of the commit, the author of the commit, etc.
 
     """
+    absolute_metadata_file_path = original_metadata_file_path.resolve()
+    git_log_format = "%x00".join(["%H", "%aI", "%an", "%ae"])
     try:
-        repo = git.Repo(search_parent_directories=True)
-
-        # get the commit hash for the last commit that modified the metadata file
-        commit_sha = repo.git.log("-1", "--format=%H", str(original_metadata_file_path))
+        # get the last commit that modified the metadata file along with its author info, git stops walking the history at the first match
+        git_log_output = _run_git_command(
+            absolute_metadata_file_path.parent, "log", "-1", f"--format={git_log_format}", "--", str(absolute_metadata_file_path)
+        ).strip()
+    except subprocess.CalledProcessError as e:
+        git_error = e.stderr.strip()
+        if "not a git repository" in git_error or "outside repository" in git_error:
+            logging.warning(
+                f"Metadata file {original_metadata_file_path} is not in a git repository, skipping author info attachment: {git_error}"
+            )
+            return None
+        logging.error(f"Failed to get the git info of metadata file {original_metadata_file_path}: {git_error}")
+        raise
 
-        commit = repo.commit(commit_sha)
-        return _commit_to_git_info(commit)
-    except git.exc.InvalidGitRepositoryError:
-        logging.warning(f"Metadata file {original_metadata_file_path} is not in a git repository, skipping author info attachment.")
+    if not git_log_output:
+        logging.warning(f"Metadata file {original_metadata_file_path} is not tracked by git, skipping author info attachment.")
         return None
-    except git.exc.GitCommandError as e:
-        if "unknown revision or path not in the working tree" in str(e):
-            logging.warning(f"Metadata file {original_metadata_file_path} is not tracked by git, skipping author info attachment.")
-            return None
-        else:
-            raise e
 
+    commit_sha, commit_timestamp, commit_author, commit_author_email = git_log_output.split(_GIT_LOG_FIELD_SEPARATOR)
+    return GitInfo(
+        commit_sha=commit_sha,
+        commit_timestamp=commit_timestamp,
+        commit_author=commit_author,
+        commit_author_email=commit_author_email,
+    )
 
-def _apply_author_info_to_metadata_file(metadata_dict: dict, original_metadata_file_path: Path) -> dict:
-    """Apply author info to the metadata file before uploading it to GCS."""
-    git_info = _get_git_info_for_file(original_metadata_file_path)
-    if git_info:
-        # Apply to the nested / optional field at metadata.data.generated.git
-        git_info_dict = to_json_sanitized_dict(git_info, exclude_none=True)
-        metadata_dict = set_(metadata_dict, "data.generated.git", git_info_dict)
-    return metadata_dict
 
+def _git_info_to_dict(git_info: GitInfo) -> dict:
+    """Serialize the git info of a commit, only once per commit."""
+    if git_info.commit_sha not in _GIT_INFO_DICTS:
+        _GIT_INFO_DICTS[git_info.commit_sha] = to_json_sanitized_dict(git_info, exclude_none=True)
+    # return a copy so that the cached dict can't be modified through the metadata it is applied to
+    return dict(_GIT_INFO_DICTS[git_info.commit_sha])
+
+
+def _get_sbom_url(docker_repository: str, docker_image_tag: str) -> str:
+    return f"https://connectors.airbyte.com/files/sbom/{docker_repository}/{docker_image_tag}.spdx.json"
 
-def _apply_sbom_url_to_metadata_file(metadata_dict: dict) -> dict:
-    """Apply sbom url to the metadata file before uploading it to GCS."""
-    try:
-        sbom_url = f"https://connectors.airbyte.com/files/sbom/{metadata_dict['data']['dockerRepository']}/{metadata_dict['data']['dockerImageTag']}.spdx.json"
-    except KeyError:
-        return metadata_dict
-    response = requests.head(sbom_url)
-    if response.ok:
-        metadata_dict = set_(metadata_dict, "data.generated.sbomUrl", sbom_url)
-    return metadata_dict
+
+@functools.lru_cache(maxsize=1024)
+def _sbom_exists(docker_repository: str, docker_image_tag: str) -> bool:
+    """Check if the SBOM of a connector version is published. The result is cached for the lifetime of the process."""
+    response = _SBOM_SESSION.head(_get_sbom_url(docker_repository, docker_image_tag), timeout=_SBOM_REQUEST_TIMEOUT_SECONDS)
+    return response.ok
 
 
 def _write_metadata_to_tmp_file(metadata_dict: dict) -> Path:
     """Write the metadata to a temporary file."""
     with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as tmp_file:
-        yaml.dump(metadata_dict, tmp_file)
+        yaml.dump(metadata_dict, tmp_file, Dumper=Dumper)
         return Path(tmp_file.name)
 
 
 def _safe_load_metadata_file(metadata_file_path: Path) -> dict:
     try:
-        metadata = yaml.safe_load(metadata_file_path.read_text())
+        metadata = yaml.load(metadata_file_path.read_bytes(), Loader=Loader)
         if metadata is None or not isinstance(metadata, dict):
             raise ValueError(f"Validation error: Metadata file {metadata_file_path} is invalid yaml.")
         return metadata
@@ -266,17 +377,77 @@ def _safe_load_metadata_file(metadata_file_path: Path) -> dict:
         raise ValueError(f"Validation error: Metadata file {metadata_file_path} is invalid yaml: {e}")
 
 
-def _apply_modifications_to_metadata_file(original_metadata_file_path: Path, validator_opts: ValidatorOptions) -> Path:
+def _apply_modifications_to_metadata_file(original_metadata_file_path: Path, validator_opts: ValidatorOptions) -> dict:
     """Apply modifications to the metadata file before uploading it to GCS.
 
-    e.g. The git commit hash, the date of the commit, the author of the commit, etc.
+    e.g. The prerelease tag, the git commit hash, the date of the commit, the author of the commit, the sbom url etc.
 
+    All the modifications are applied in a single pass on metadata.data.
     """
     metadata = _safe_load_metadata_file(original_metadata_file_path)
-    metadata = _apply_prerelease_overrides(metadata, validator_opts)
-    metadata = _apply_author_info_to_metadata_file(metadata, original_metadata_file_path)
-    metadata = _apply_sbom_url_to_metadata_file(metadata)
-    return _write_metadata_to_tmp_file(metadata)
+    data = metadata.setdefault("data", {})
+    generated = {}
+
+    # replace any dockerImageTag references with the prerelease tag
+    # this includes metadata.data.dockerImageTag, metadata.data.registryOverrides[].dockerImageTag
+    # where registries is a dictionary of registry name to registry object
+    if validator_opts.prerelease_tag is not None:
+        data["dockerImageTag"] = validator_opts.prerelease_tag
+        for registry in data.get("registryOverrides", {}).values():
+            if "dockerImageTag" in registry:
+                registry["dockerImageTag"] = validator_opts.prerelease_tag
+
+    # Getting the git info (git subprocess) and checking the sbom (HTTP request) don't depend on each other,
+    # so we run them concurrently
+    docker_repository, docker_image_tag = data.get("dockerRepository"), data.get("dockerImageTag")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        git_info_future = executor.submit(_get_git_info_for_file, original_metadata_file_path)
+        sbom_exists_future = (
+            executor.submit(_sbom_exists, docker_repository, docker_image_tag) if docker_repository and docker_image_tag else None
+        )
+
+        git_info = git_info_future.result()
+        if git_info:
+            generated["git"] = _git_info_to_dict(git_info)
+
+        if sbom_exists_future and sbom_exists_future.result():
+            generated["sbomUrl"] = _get_sbom_url(docker_repository, docker_image_tag)
+
+    # Apply to the nested / optional fields at metadata.data.generated
+    if generated:
+        data.setdefault("generated", {}).update(generated)
+
+    return metadata
+
+
+def _get_remote_file_paths_to_check(
+    metadata: ConnectorMetadataDefinitionV0,
+    icon_file_path: Path,
+    docs_path: Path,
+    metadata_versions: List[str],
+    doc_uploads: List[Tuple[bool, bool]],
+) -> List[str]:
+    """List the remote paths of the files that may be uploaded, using the same paths as the upload functions.
+
+    Args:
+        metadata_versions (List[str]): Versions the metadata file is uploaded to.
+        doc_uploads (List[Tuple[bool, bool]]): (latest, inapp) flags of the doc uploads.
+    """
+    remote_file_paths = []
+
+    local_icon_path, remote_icon_path = _get_icon_file_paths(metadata, icon_file_path)
+    if local_icon_path.exists():
+        remote_file_paths.append(remote_icon_path)
+
+    for version in metadata_versions:
+        remote_file_paths.append(get_metadata_remote_file_path(metadata.data.dockerRepository, version))
+
+    for latest, inapp in doc_uploads:
+        local_doc_path, remote_doc_path = _get_doc_file_paths(metadata, docs_path, latest, inapp)
+        if local_doc_path and local_doc_path.exists():
+            remote_file_paths.append(remote_doc_path)
+
+    return remote_file_paths
 
 
 def upload_metadata_to_gcs(bucket_name: str, metadata_file_path: Path, validator_opts: ValidatorOptions) -> MetadataUploadInfo:
@@ -294,9 +465,10 @@ def upload_metadata_to_gcs(bucket_name: str, metadata_file_path: Path, validator
         Tuple[bool, str]: Whether the metadata file was uploaded and its blob id.
     """
     icon_file_path = metadata_file_path.parent / ICON_FILE_NAME
-    metadata_file_path = _apply_modifications_to_metadata_file(metadata_file_path, validator_opts)
+    metadata_dict = _apply_modifications_to_metadata_file(metadata_file_path, validator_opts)
 
-    metadata, error = validate_and_load(metadata_file_path, POST_UPLOAD_VALIDATORS, validator_opts)
+    # Validate the modified metadata in memory, it is only written to a file once it is about to be uploaded
+    metadata, error = validate_and_load_dict(metadata_dict, POST_UPLOAD_VALIDATORS, validator_opts)
     if metadata is None:
         raise ValueError(f"Metadata file {metadata_file_path} is invalid for uploading: {error}")
 
@@ -308,26 +480,23 @@ def upload_metadata_to_gcs(bucket_name: str, metadata_file_path: Path, validator
     if not gcs_creds:
         raise ValueError("Please set the GCS_CREDENTIALS env var.")
 
-    service_account_info = json.loads(gcs_creds)
-    credentials = service_account.Credentials.from_service_account_info(service_account_info)
-    storage_client = storage.Client(credentials=credentials)
+    storage_client = _get_storage_client(gcs_creds)
     bucket = storage_client.bucket(bucket_name)
     docs_path = Path(validator_opts.docs_path)
 
-    icon_uploaded, icon_blob_id = _icon_upload(metadata, bucket, icon_file_path)
+    # The uploads run concurrently, so a missing doc must fail the upload before any of them starts.
+    # Otherwise the latest files could be published for a connector whose upload failed.
+    local_doc_path, _ = _get_doc_file_paths(metadata, docs_path, latest=False, inapp=False)
+    if local_doc_path and not local_doc_path.exists():
+        raise FileNotFoundError(f"Expected to find connector doc file at {local_doc_path}, but none was found.")
 
-    # Upload version metadata and doc
     # If the connector is a pre-release, we use the pre-release tag as the version
     # Otherwise, we use the dockerImageTag from the metadata
     version = metadata.data.dockerImageTag if not is_pre_release else validator_opts.prerelease_tag
-    version_uploaded, version_blob_id = _metadata_upload(metadata, bucket, metadata_file_path, version)
-    doc_version_uploaded, doc_version_blob_id = _doc_upload(metadata, bucket, docs_path, False, False)
-    doc_inapp_version_uploaded, doc_inapp_version_blob_id = _doc_upload(metadata, bucket, docs_path, False, True)
-
-    latest_uploaded, latest_blob_id = False, None
-    doc_latest_uploaded, doc_latest_blob_id = doc_inapp_latest_uploaded, doc_inapp_latest_blob_id = False, None
 
-    release_candidate_uploaded, release_candidate_blob_id = False, None
+    # Upload version metadata and doc
+    metadata_uploads = {"version_metadata": version}
+    doc_uploads = {"doc_version": (False, False), "doc_inapp_version": (False, True)}
 
     # Latest upload
     # We upload
@@ -335,17 +504,47 @@ def upload_metadata_to_gcs(bucket_name: str, metadata_file_path: Path, validator
     # - the current doc to the "latest" path
     # - the current inapp doc to the "latest" path
     if should_upload_latest:
-        latest_uploaded, latest_blob_id = _metadata_upload(metadata, bucket, metadata_file_path, LATEST_GCS_FOLDER_NAME)
-        doc_latest_uploaded, doc_latest_blob_id = _doc_upload(metadata, bucket, docs_path, True, False)
-        doc_inapp_latest_uploaded, doc_inapp_latest_blob_id = _doc_upload(metadata, bucket, docs_path, True, True)
+        metadata_uploads["latest_metadata"] = LATEST_GCS_FOLDER_NAME
+        doc_uploads["doc_latest"] = (True, False)
+        doc_uploads["doc_inapp_latest"] = (True, True)
 
     # Release candidate upload
     # We just upload the current metadata to the "release_candidate" path
     # The doc and inapp doc are not uploaded, which means that the release candidate will still point to the latest doc
     if should_upload_release_candidate:
-        release_candidate_uploaded, release_candidate_blob_id = _metadata_upload(
-            metadata, bucket, metadata_file_path, RELEASE_CANDIDATE_GCS_FOLDER_NAME
+        metadata_uploads["release_candidate_metadata"] = RELEASE_CANDIDATE_GCS_FOLDER_NAME
+
+    # Fetch the md5_hash of every remote file we may upload in a single batch request
+    # instead of checking each of them one by one
+    remote_file_paths = _get_remote_file_paths_to_check(
+        metadata, icon_file_path, docs_path, list(metadata_uploads.values()), list(doc_uploads.values())
+    )
+    prefetched_blobs = _prefetch_remote_blobs(storage_client, bucket, remote_file_paths)
+
+    metadata_file_path = _write_metadata_to_tmp_file(metadata_dict)
+
+    # The uploads do not depend on each other, so we run them concurrently to overlap their network round-trips
+    upload_tasks = {"icon": functools.partial(_icon_upload, metadata, bucket, icon_file_path, prefetched_blobs=prefetched_blobs)}
+    for upload_id, metadata_version in metadata_uploads.items():
+        upload_tasks[upload_id] = functools.partial(
+            _metadata_upload, metadata, bucket, metadata_file_path, metadata_version, prefetched_blobs=prefetched_blobs
         )
+    for upload_id, (latest, inapp) in doc_uploads.items():
+        upload_tasks[upload_id] = functools.partial(
+            _doc_upload, metadata, bucket, docs_path, latest, inapp, prefetched_blobs=prefetched_blobs
+        )
+
+    with ThreadPoolExecutor(max_workers=len(upload_tasks)) as executor:
+        upload_results = dict(zip(upload_tasks.keys(), executor.map(lambda upload_task: upload_task(), upload_tasks.values())))
+
+    icon_uploaded, icon_blob_id = upload_results["icon"]
+    version_uploaded, version_blob_id = upload_results["version_metadata"]
+    doc_version_uploaded, doc_version_blob_id = upload_results["doc_version"]
+    doc_inapp_version_uploaded, doc_inapp_version_blob_id = upload_results["doc_inapp_version"]
+    latest_uploaded, latest_blob_id = upload_results.get("latest_metadata", (False, None))
+    doc_latest_uploaded, doc_latest_blob_id = upload_results.get("doc_latest", (False, None))
+    doc_inapp_latest_uploaded, doc_inapp_latest_blob_id = upload_results.get("doc_inapp_latest", (False, None))
+    release_candidate_uploaded, release_candidate_blob_id = upload_results.get("release_candidate_metadata", (False, None))
 
     return MetadataUploadInfo(
         metadata_uploaded=version_uploaded or latest_uploaded or release_candidate_uploaded,
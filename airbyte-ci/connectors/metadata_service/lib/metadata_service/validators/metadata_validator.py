@@ -228,9 +228,21 @@ def validate_and_load(
     If the metadata file is valid, metadata_model will be populated.
     Otherwise, error_message will be populated with a string describing the error.
     """
+    metadata = yaml.safe_load(file_path.read_text())
+    return validate_and_load_dict(metadata, validators_to_run, validator_opts)
+
+
+def validate_and_load_dict(
+    metadata: dict,
+    validators_to_run: List[Validator],
+    validator_opts: ValidatorOptions,
+) -> Tuple[Optional[ConnectorMetadataDefinitionV0], Optional[ValidationError]]:
+    """Load an already parsed metadata file (runs jsonschema validation) and run optional extra validators.
+
+    Returns a tuple of (metadata_model, error_message), like validate_and_load.
+    """
     try:
-        # Load the metadata file - this implicitly runs jsonschema validation
-        metadata = yaml.safe_load(file_path.read_text())
+        # Load the metadata - this implicitly runs jsonschema validation
         metadata_model = ConnectorMetadataDefinitionV0.parse_obj(metadata)
     except ValidationError as e:
         return None, f"Validation error: {e}"
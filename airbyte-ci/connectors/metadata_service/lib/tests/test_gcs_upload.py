@@ -3,16 +3,21 @@
 #
 
 import json
+import subprocess
 from pathlib import Path
 from typing import Optional
 
 import pytest
+import requests
 import yaml
+from google.api_core.exceptions import Forbidden
+from google.auth.credentials import AnonymousCredentials
 from metadata_service import gcs_upload
 from metadata_service.constants import DOC_FILE_NAME, LATEST_GCS_FOLDER_NAME, METADATA_FILE_NAME, RELEASE_CANDIDATE_GCS_FOLDER_NAME
 from metadata_service.models.generated.ConnectorMetadataDefinitionV0 import ConnectorMetadataDefinitionV0
+from metadata_service.models.generated.GitInfo import GitInfo
 from metadata_service.models.transform import to_json_sanitized_dict
-from metadata_service.validators.metadata_validator import ValidatorOptions
+from metadata_service.validators.metadata_validator import ValidatorOptions, validate_and_load
 from pydash.objects import get
 
 MOCK_VERSIONS_THAT_DO_NOT_EXIST = ["99.99.99", "0.0.0"]
@@ -85,7 +90,7 @@ def setup_upload_mocks(
     service_account_json = '{"type": "service_account"}'
     mocker.patch.dict("os.environ", {"GCS_CREDENTIALS": service_account_json})
     mock_credentials = mocker.Mock()
-    mock_storage_client = mocker.Mock()
+    mock_storage_client = mocker.MagicMock()
 
     latest_blob_exists = latest_blob_md5_hash is not None
     version_blob_exists = version_blob_md5_hash is not None
@@ -97,10 +102,30 @@ def setup_upload_mocks(
     mock_doc_version_blob = mocker.Mock(exists=mocker.Mock(return_value=doc_version_blob_exists), md5_hash=doc_version_blob_md5_hash)
     mock_doc_latest_blob = mocker.Mock(exists=mocker.Mock(return_value=doc_latest_blob_exists), md5_hash=doc_latest_blob_md5_hash)
     mock_bucket = mock_storage_client.bucket.return_value
-    mock_bucket.blob.side_effect = [mock_version_blob, mock_doc_version_blob, mock_latest_blob, mock_doc_latest_blob]
+
+    # The release candidate metadata is uploaded in place of the latest one, so it shares its blob
+    def get_mock_blob(blob_path):
+        is_version_blob = f"/{LATEST_GCS_FOLDER_NAME}/" not in blob_path and f"/{RELEASE_CANDIDATE_GCS_FOLDER_NAME}/" not in blob_path
+        if blob_path.endswith(METADATA_FILE_NAME):
+            return mock_version_blob if is_version_blob else mock_latest_blob
+        if blob_path.endswith(DOC_FILE_NAME):
+            return mock_doc_version_blob if is_version_blob else mock_doc_latest_blob
+        raise ValueError(f"Unexpected blob path: {blob_path}")
+
+    mock_bucket.blob.side_effect = get_mock_blob
+
+    # The batch prefetching the blobs answers each reload with a 404 when the blob does not exist
+    def finish_batch(raise_exception):
+        return [
+            mocker.Mock(status_code=200 if get_mock_blob(blob_call.args[0]).md5_hash else 404)
+            for blob_call in mock_bucket.blob.call_args_list
+        ]
+
+    mock_storage_client.batch.return_value.finish.side_effect = finish_batch
 
     mocker.patch.object(gcs_upload.service_account.Credentials, "from_service_account_info", mocker.Mock(return_value=mock_credentials))
     mocker.patch.object(gcs_upload.storage, "Client", mocker.Mock(return_value=mock_storage_client))
+    mocker.patch.dict(gcs_upload._STORAGE_CLIENTS, clear=True)
 
     # Mock md5 hash
     def side_effect_compute_gcs_md5(file_path):
@@ -257,6 +282,8 @@ def test_upload_metadata_to_gcs_valid_metadata(
             VALID_DOC_FILE_PATH,
         )
         mocker.patch.object(gcs_upload, "_write_metadata_to_tmp_file", mocker.Mock(return_value=metadata_file_path))
+        # The uploaded metadata is validated in memory, so we skip the git info to compare it to the original file
+        mocker.patch.object(gcs_upload, "_get_git_info_for_file", mocker.Mock(return_value=None))
 
         expected_version_key = f"metadata/{metadata.data.dockerRepository}/{metadata.data.dockerImageTag}/{METADATA_FILE_NAME}"
         expected_latest_key = f"metadata/{metadata.data.dockerRepository}/{LATEST_GCS_FOLDER_NAME}/{METADATA_FILE_NAME}"
@@ -284,38 +311,47 @@ def test_upload_metadata_to_gcs_valid_metadata(
         if is_release_candidate:
             gcs_upload._metadata_upload.assert_has_calls(
                 [
-                    mocker.call(metadata, mocks["mock_bucket"], metadata_file_path, metadata.data.dockerImageTag),
-                    mocker.call(metadata, mocks["mock_bucket"], metadata_file_path, RELEASE_CANDIDATE_GCS_FOLDER_NAME),
-                ]
+                    mocker.call(
+                        metadata, mocks["mock_bucket"], metadata_file_path, metadata.data.dockerImageTag, prefetched_blobs=mocker.ANY
+                    ),
+                    mocker.call(
+                        metadata, mocks["mock_bucket"], metadata_file_path, RELEASE_CANDIDATE_GCS_FOLDER_NAME, prefetched_blobs=mocker.ANY
+                    ),
+                ],
+                any_order=True,
             )
         else:
             gcs_upload._metadata_upload.assert_has_calls(
                 [
-                    mocker.call(metadata, mocks["mock_bucket"], metadata_file_path, metadata.data.dockerImageTag),
-                    mocker.call(metadata, mocks["mock_bucket"], metadata_file_path, LATEST_GCS_FOLDER_NAME),
-                ]
+                    mocker.call(
+                        metadata, mocks["mock_bucket"], metadata_file_path, metadata.data.dockerImageTag, prefetched_blobs=mocker.ANY
+                    ),
+                    mocker.call(metadata, mocks["mock_bucket"], metadata_file_path, LATEST_GCS_FOLDER_NAME, prefetched_blobs=mocker.ANY),
+                ],
+                any_order=True,
             )
         gcs_upload._doc_upload.assert_called()
 
         gcs_upload.service_account.Credentials.from_service_account_info.assert_called_with(json.loads(mocks["service_account_json"]))
         mocks["mock_storage_client"].bucket.assert_called_with("my_bucket")
+        mocks["mock_storage_client"].batch.assert_called_with(raise_exception=False)
+        # every blob is prefetched, so none of them is fetched again when it is uploaded
         if is_release_candidate:
-            mocks["mock_bucket"].blob.assert_has_calls(
-                [
-                    mocker.call(expected_version_key),
-                    mocker.call(expected_version_doc_key),
-                    mocker.call(expected_release_candidate_key),
-                ]
-            )
+            expected_blob_calls = [
+                mocker.call(expected_version_key),
+                mocker.call(expected_version_doc_key),
+                mocker.call(expected_release_candidate_key),
+            ]
         else:
-            mocks["mock_bucket"].blob.assert_has_calls(
-                [
-                    mocker.call(expected_version_key),
-                    mocker.call(expected_version_doc_key),
-                    mocker.call(expected_latest_key),
-                    mocker.call(expected_latest_doc_key),
-                ]
-            )
+            expected_blob_calls = [
+                mocker.call(expected_version_key),
+                mocker.call(expected_version_doc_key),
+                mocker.call(expected_latest_key),
+                mocker.call(expected_latest_doc_key),
+            ]
+        mocks["mock_bucket"].blob.assert_has_calls(expected_blob_calls, any_order=True)
+        assert mocks["mock_bucket"].blob.call_count == len(expected_blob_calls)
+        mocks["mock_storage_client"].batch.return_value.finish.assert_called_once_with(raise_exception=False)
 
         version_metadata_uploaded_file = next((file for file in upload_info.uploaded_files if file.id == "version_metadata"), None)
         assert version_metadata_uploaded_file, "version_metadata not found in uploaded files."
@@ -369,6 +405,299 @@ def test_upload_metadata_to_gcs_valid_metadata(
         gcs_upload._doc_upload.reset_mock()
 
 
+def _make_batch_response(mocker, subresponses):
+    """Build the multipart response of a GCS batch request from a list of (status, payload) sub-responses."""
+    boundary = "batch_boundary"
+    parts = [
+        f"--{boundary}\nContent-Type: application/http\nContent-ID: <response-{i}>\n\n"
+        f"HTTP/1.1 {status} Status\nContent-Type: application/json\n\n{json.dumps(payload)}\n"
+        for i, (status, payload) in enumerate(subresponses)
+    ]
+    return mocker.Mock(
+        status_code=200,
+        headers={"content-type": f"multipart/mixed; boundary={boundary}"},
+        content="".join(parts + [f"--{boundary}--\n"]).encode("utf-8"),
+    )
+
+
+def test_prefetch_remote_blobs_reloads_all_blobs_in_one_batch(mocker):
+    storage_client = gcs_upload.storage.Client(project="test", credentials=AnonymousCredentials())
+    bucket = storage_client.bucket("test-bucket")
+    existing_path, missing_path, forbidden_path = [
+        f"metadata/airbyte/source-exists/{version}/metadata.yaml" for version in ["1.0.0", "latest", "rc"]
+    ]
+    make_request = mocker.patch.object(
+        storage_client._base_connection,
+        "_make_request",
+        return_value=_make_batch_response(
+            mocker,
+            [
+                (200, {"name": existing_path, "bucket": "test-bucket", "md5Hash": "existing_md5_hash"}),
+                (404, {"error": {"code": 404, "message": "No such object"}}),
+                (403, {"error": {"code": 403, "message": "Forbidden"}}),
+            ],
+        ),
+    )
+
+    prefetched_blobs = gcs_upload._prefetch_remote_blobs(storage_client, bucket, [existing_path, missing_path, forbidden_path])
+
+    # all the blobs are reloaded by a single batch request
+    make_request.assert_called_once()
+    assert make_request.call_args.args[1].endswith("/batch/storage/v1")
+
+    assert prefetched_blobs[existing_path].md5_hash == "existing_md5_hash"
+    assert prefetched_blobs[missing_path].md5_hash is None
+    # a blob that failed to reload for another reason than not existing is left to the per-blob reload
+    assert forbidden_path not in prefetched_blobs
+
+    make_request.return_value = mocker.Mock(status_code=403, headers={}, json=lambda: {"error": {"code": 403, "message": "Forbidden"}})
+    with pytest.raises(Forbidden):
+        gcs_upload.upload_file_if_changed(Path("metadata.yaml"), bucket, forbidden_path, prefetched_blobs=prefetched_blobs)
+
+
+@pytest.mark.parametrize(
+    "batch_error",
+    [
+        pytest.param(503, id="Batch request fails"),
+        pytest.param(requests.exceptions.ConnectionError("Connection reset"), id="Batch request cannot be sent"),
+    ],
+)
+def test_prefetch_remote_blobs_falls_back_when_the_batch_fails(mocker, batch_error):
+    storage_client = gcs_upload.storage.Client(project="test", credentials=AnonymousCredentials())
+    bucket = storage_client.bucket("test-bucket")
+    if isinstance(batch_error, Exception):
+        mocker.patch.object(storage_client._base_connection, "_make_request", side_effect=batch_error)
+    else:
+        error_response = mocker.Mock(status_code=batch_error, headers={}, json=lambda: {"error": {"code": batch_error, "message": "Error"}})
+        mocker.patch.object(storage_client._base_connection, "_make_request", return_value=error_response)
+
+    assert gcs_upload._prefetch_remote_blobs(storage_client, bucket, ["metadata/airbyte/source-exists/latest/metadata.yaml"]) == {}
+    # the batch is no longer the current one, so the per-blob reloads are not deferred
+    assert storage_client.current_batch is None
+
+
+@pytest.mark.parametrize(
+    "remote_md5_hash, expected_uploaded",
+    [
+        pytest.param("same_md5_hash", False, id="Prefetched blob matches: no upload should happen."),
+        pytest.param("different_md5_hash", True, id="Prefetched blob does not match: blob should be uploaded."),
+        pytest.param(None, True, id="Prefetched blob does not exist: blob should be uploaded."),
+    ],
+)
+def test_upload_file_if_changed_uses_prefetched_blob(mocker, remote_md5_hash, expected_uploaded):
+    compute_gcs_md5 = mocker.patch.object(gcs_upload, "compute_gcs_md5", return_value="same_md5_hash")
+    mock_bucket = mocker.Mock()
+    blob_path = "metadata/airbyte/source-exists/latest/metadata.yaml"
+    prefetched_blob = mocker.Mock(md5_hash=remote_md5_hash)
+
+    uploaded, blob_id = gcs_upload.upload_file_if_changed(
+        Path("metadata.yaml"), mock_bucket, blob_path, prefetched_blobs={blob_path: prefetched_blob}
+    )
+
+    assert uploaded == expected_uploaded
+    assert blob_id == prefetched_blob.id
+    mock_bucket.blob.assert_not_called()
+    prefetched_blob.exists.assert_not_called()
+    prefetched_blob.reload.assert_not_called()
+    assert prefetched_blob.upload_from_filename.called == expected_uploaded
+    # the local file is only hashed when there is a remote md5_hash to compare it to
+    assert compute_gcs_md5.called == (remote_md5_hash is not None)
+
+
+@pytest.mark.parametrize(
+    "remote_md5_hash, expected_uploaded",
+    [
+        pytest.param("same_md5_hash", False, id="Remote blob matches: no upload should happen."),
+        pytest.param("different_md5_hash", True, id="Remote blob does not match: blob should be uploaded."),
+        pytest.param(None, True, id="Remote blob does not exist: blob should be uploaded."),
+    ],
+)
+def test_upload_file_if_changed_reloads_blob_once(mocker, remote_md5_hash, expected_uploaded):
+    mocker.patch.object(gcs_upload, "compute_gcs_md5", return_value="same_md5_hash")
+    remote_blob = mocker.Mock(md5_hash=remote_md5_hash)
+    if remote_md5_hash is None:
+        remote_blob.reload.side_effect = gcs_upload.NotFound("blob not found")
+    mock_bucket = mocker.Mock(blob=mocker.Mock(return_value=remote_blob))
+
+    uploaded, blob_id = gcs_upload.upload_file_if_changed(
+        Path("metadata.yaml"), mock_bucket, "metadata/airbyte/source-exists/latest/metadata.yaml"
+    )
+
+    assert uploaded == expected_uploaded
+    assert blob_id == remote_blob.id
+    remote_blob.reload.assert_called_once()
+    remote_blob.exists.assert_not_called()
+    assert remote_blob.upload_from_filename.called == expected_uploaded
+
+
+def test_compute_gcs_md5_is_cached_until_the_file_changes(mocker, tmp_path):
+    file_path = tmp_path / "metadata.yaml"
+    file_path.write_text("data: {}")
+    md5_spy = mocker.spy(gcs_upload.hashlib, "md5")
+
+    first_md5_hash = gcs_upload.compute_gcs_md5(file_path)
+    assert gcs_upload.compute_gcs_md5(file_path) == first_md5_hash
+    assert md5_spy.call_count == 1
+
+    file_path.write_text("data: {name: changed}")
+    assert gcs_upload.compute_gcs_md5(file_path) != first_md5_hash
+    assert md5_spy.call_count == 2
+
+
+def _init_git_repo(repo_path: Path):
+    """Create a git repository and return a function running git commands in it."""
+
+    def git(*args):
+        return subprocess.run(["git", "-C", str(repo_path), *args], capture_output=True, text=True, check=True).stdout.strip()
+
+    git("init", "-b", "master")
+    git("config", "user.name", "Octavia Squidington")
+    git("config", "user.email", "octavia@airbyte.io")
+    return git
+
+
+def test_get_git_info_for_file_returns_last_commit_that_modified_the_file(monkeypatch, tmp_path):
+    git = _init_git_repo(tmp_path)
+    metadata_file_path = tmp_path / "connectors" / "source-exists" / "metadata.yaml"
+    metadata_file_path.parent.mkdir(parents=True)
+    metadata_file_path.write_text("data: {}")
+    git("add", str(metadata_file_path))
+    git("commit", "-m", "Add metadata", "--date", "2023-10-12T10:00:00+02:00")
+    metadata_commit_sha = git("rev-parse", "HEAD")
+    (tmp_path / "README.md").write_text("readme")
+    git("add", "README.md")
+    git("commit", "-m", "Add readme")
+    monkeypatch.chdir(tmp_path)
+
+    git_info = gcs_upload._get_git_info_for_file(Path("connectors/source-exists/metadata.yaml"))
+
+    assert git_info.commit_sha == metadata_commit_sha
+    assert git_info.commit_author == "Octavia Squidington"
+    assert git_info.commit_author_email == "octavia@airbyte.io"
+    assert git_info.commit_timestamp.isoformat() == "2023-10-12T10:00:00+02:00"
+    assert gcs_upload._get_git_info_for_file(tmp_path / "untracked.yaml") is None
+    assert gcs_upload._get_git_info_for_file(tmp_path.parent / "outside_of_the_repo.yaml") is None
+
+
+def test_get_git_info_for_file_returns_merge_commit_that_last_modified_the_file(monkeypatch, tmp_path):
+    git = _init_git_repo(tmp_path)
+    metadata_file_path = tmp_path / "metadata.yaml"
+    metadata_file_path.write_text("data: {}")
+    git("add", "metadata.yaml")
+    git("commit", "-m", "Add metadata")
+    git("checkout", "-b", "branch")
+    metadata_file_path.write_text("data: {name: branch}")
+    git("commit", "-am", "Change metadata on branch")
+    git("checkout", "master")
+    metadata_file_path.write_text("data: {name: master}")
+    git("commit", "-am", "Change metadata on master")
+    # resolve the merge conflict with content that is in neither parent
+    subprocess.run(["git", "-C", str(tmp_path), "merge", "branch"], capture_output=True)
+    metadata_file_path.write_text("data: {name: merged}")
+    git("commit", "-am", "Merge branch")
+    merge_commit_sha = git("rev-parse", "HEAD")
+    monkeypatch.chdir(tmp_path)
+
+    git_info = gcs_upload._get_git_info_for_file(metadata_file_path)
+
+    assert git_info.commit_sha == merge_commit_sha
+
+
+@pytest.mark.parametrize(
+    "git_error, expect_raise",
+    [
+        pytest.param("fatal: not a git repository (or any of the parent directories): .git", False, id="Not in a git repository"),
+        pytest.param(
+            "fatal: /outside/metadata.yaml: '/outside/metadata.yaml' is outside repository at '/repo'",
+            False,
+            id="Outside of the repository",
+        ),
+        pytest.param("fatal: detected dubious ownership in repository at '/repo'", True, id="Any other git error"),
+    ],
+)
+def test_get_git_info_for_file_only_skips_files_outside_of_a_repository(mocker, git_error, expect_raise):
+    mocker.patch.object(
+        gcs_upload, "_run_git_command", side_effect=subprocess.CalledProcessError(128, ["git", "log"], output="", stderr=git_error)
+    )
+
+    if expect_raise:
+        with pytest.raises(subprocess.CalledProcessError):
+            gcs_upload._get_git_info_for_file(Path("metadata.yaml"))
+    else:
+        assert gcs_upload._get_git_info_for_file(Path("metadata.yaml")) is None
+
+
+@pytest.mark.parametrize("sbom_exists", [True, False])
+def test_apply_modifications_to_metadata_file_checks_sbom_of_each_version_once(mocker, tmp_path, sbom_exists):
+    gcs_upload._sbom_exists.cache_clear()
+    head = mocker.patch.object(gcs_upload._SBOM_SESSION, "head", return_value=mocker.Mock(ok=sbom_exists))
+    mocker.patch.object(gcs_upload, "_get_git_info_for_file", return_value=None)
+    metadata_file_path = tmp_path / METADATA_FILE_NAME
+    metadata_file_path.write_text(yaml.dump({"data": {"dockerRepository": "airbyte/source-exists", "dockerImageTag": "1.0.0"}}))
+    expected_sbom_url = "https://connectors.airbyte.com/files/sbom/airbyte/source-exists/1.0.0.spdx.json"
+
+    for _ in range(2):
+        metadata_dict = gcs_upload._apply_modifications_to_metadata_file(metadata_file_path, ValidatorOptions(docs_path=DOCS_PATH))
+        assert get(metadata_dict, "data.generated.sbomUrl") == (expected_sbom_url if sbom_exists else None)
+
+    head.assert_called_once_with(expected_sbom_url, timeout=gcs_upload._SBOM_REQUEST_TIMEOUT_SECONDS)
+    gcs_upload._sbom_exists.cache_clear()
+
+
+def test_apply_modifications_to_metadata_file_keeps_existing_generated_fields(mocker, tmp_path):
+    git_info = GitInfo(commit_sha="abc123", commit_author="Octavia Squidington", commit_author_email="octavia@airbyte.io")
+    mocker.patch.object(gcs_upload, "_get_git_info_for_file", return_value=git_info)
+    mocker.patch.object(gcs_upload, "_sbom_exists", return_value=False)
+    metadata_file_path = tmp_path / METADATA_FILE_NAME
+    metadata_file_path.write_text(
+        yaml.dump(
+            {
+                "data": {
+                    "dockerRepository": "airbyte/source-exists",
+                    "dockerImageTag": "1.0.0",
+                    "registryOverrides": {"cloud": {"dockerImageTag": "0.9.0"}, "oss": {"enabled": True}},
+                    "generated": {"source_file_info": {"metadata_file_path": "metadata.yaml"}},
+                }
+            }
+        )
+    )
+
+    metadata_dict = gcs_upload._apply_modifications_to_metadata_file(
+        metadata_file_path, ValidatorOptions(docs_path=DOCS_PATH, prerelease_tag="1.0.1-dev.abc123")
+    )
+
+    assert metadata_dict["data"]["dockerImageTag"] == "1.0.1-dev.abc123"
+    assert metadata_dict["data"]["registryOverrides"] == {"cloud": {"dockerImageTag": "1.0.1-dev.abc123"}, "oss": {"enabled": True}}
+    assert metadata_dict["data"]["generated"] == {
+        "source_file_info": {"metadata_file_path": "metadata.yaml"},
+        "git": to_json_sanitized_dict(git_info, exclude_none=True),
+    }
+
+
+def test_get_storage_client_is_reused_for_the_same_credentials(mocker):
+    mocker.patch.dict(gcs_upload._STORAGE_CLIENTS, clear=True)
+    mocker.patch.object(gcs_upload.service_account.Credentials, "from_service_account_info")
+    storage_client_class = mocker.patch.object(gcs_upload.storage, "Client", side_effect=lambda credentials: mocker.Mock())
+
+    first_client = gcs_upload._get_storage_client('{"type": "service_account", "project_id": "first"}')
+    assert gcs_upload._get_storage_client('{"type": "service_account", "project_id": "first"}') is first_client
+    assert gcs_upload._get_storage_client('{"type": "service_account", "project_id": "second"}') is not first_client
+    assert storage_client_class.call_count == 2
+
+
+def test_git_info_to_dict_serializes_each_commit_once(mocker):
+    mocker.patch.dict(gcs_upload._GIT_INFO_DICTS, clear=True)
+    to_json_sanitized_dict_spy = mocker.spy(gcs_upload, "to_json_sanitized_dict")
+    git_info = GitInfo(commit_sha="abc123", commit_author="Octavia Squidington", commit_author_email="octavia@airbyte.io")
+
+    first_git_info_dict = gcs_upload._git_info_to_dict(git_info)
+    second_git_info_dict = gcs_upload._git_info_to_dict(git_info.copy())
+
+    assert first_git_info_dict == second_git_info_dict == to_json_sanitized_dict(git_info, exclude_none=True)
+    assert first_git_info_dict is not second_git_info_dict
+    assert to_json_sanitized_dict_spy.call_count == 1
+
+
 def test_upload_metadata_to_gcs_non_existent_metadata_file():
     metadata_file_path = Path("./i_dont_exist.yaml")
     with pytest.raises(ValueError, match="No such file or directory"):
@@ -401,7 +730,7 @@ def test_upload_invalid_metadata_to_gcs(mocker, invalid_metadata_yaml_files):
 
 
 def test_upload_metadata_to_gcs_invalid_docker_images(mocker, invalid_metadata_upload_files):
-    setup_upload_mocks(mocker, None, None, "new_md5_hash", None, None, None, None, None)
+    setup_upload_mocks(mocker, "existing_md5_hash", "existing_md5_hash", "new_md5_hash", None, None, None, None, None)
 
     # Test that valid metadata files that reference invalid docker images throw a ValueError
     for invalid_metadata_file in invalid_metadata_upload_files:
@@ -419,6 +748,23 @@ def test_upload_metadata_to_gcs_invalid_docker_images(mocker, invalid_metadata_u
         )
 
 
+def test_upload_metadata_to_gcs_missing_doc_fails_before_any_upload(mocker, valid_metadata_upload_files):
+    metadata_file_path = Path(valid_metadata_upload_files[0])
+    mocks = setup_upload_mocks(mocker, None, None, "new_md5_hash", None, None, None, metadata_file_path, None)
+    metadata_upload = mocker.patch.object(gcs_upload, "_metadata_upload")
+    doc_upload = mocker.patch.object(gcs_upload, "_doc_upload")
+    icon_upload = mocker.patch.object(gcs_upload, "_icon_upload")
+    mocker.patch.object(gcs_upload, "get_doc_local_file_path", return_value=Path(DOCS_PATH) / "integrations/sources/missing.md")
+
+    with pytest.raises(FileNotFoundError, match="Expected to find connector doc file"):
+        gcs_upload.upload_metadata_to_gcs("my_bucket", metadata_file_path, ValidatorOptions(docs_path=DOCS_PATH))
+
+    metadata_upload.assert_not_called()
+    doc_upload.assert_not_called()
+    icon_upload.assert_not_called()
+    mocks["mock_storage_client"].batch.assert_not_called()
+
+
 def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_files, tmp_path):
     # Arrange
     mocker.patch("metadata_service.gcs_upload._metadata_upload", return_value=(True, "someid"))
@@ -436,11 +782,15 @@ def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_fi
         metadata_file_path = Path(valid_metadata_upload_file)
         mocks = setup_upload_mocks(mocker, "new_md5_hash1", "new_md5_hash2", "new_md5_hash3", None, None, None, metadata_file_path, None)
         # Mock tempfile to have a deterministic path
+        tmp_metadata_file = tmp_metadata_file_path.open("w")
         mocker.patch.object(
             gcs_upload.tempfile,
             "NamedTemporaryFile",
             mocker.Mock(
-                return_value=mocker.Mock(__enter__=mocker.Mock(return_value=tmp_metadata_file_path.open("w")), __exit__=mocker.Mock())
+                return_value=mocker.Mock(
+                    __enter__=mocker.Mock(return_value=tmp_metadata_file),
+                    __exit__=mocker.Mock(side_effect=lambda *args: tmp_metadata_file.close()),
+                )
             ),
         )
 
@@ -455,7 +805,7 @@ def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_fi
         assert gcs_upload._metadata_upload.call_count == 1
         overridden_metadata = ConnectorMetadataDefinitionV0.parse_obj(yaml.safe_load(tmp_metadata_file_path.read_text()))
         gcs_upload._metadata_upload.assert_called_with(
-            overridden_metadata, mocks["mock_bucket"], tmp_metadata_file_path, prerelease_image_tag
+            overridden_metadata, mocks["mock_bucket"], tmp_metadata_file_path, prerelease_image_tag, prefetched_blobs=mocker.ANY
         )
 
         # Assert that _doc_upload is only called twice, both with latest set to False
@@ -468,7 +818,7 @@ def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_fi
         assert tmp_metadata_file_path.exists(), f"{tmp_metadata_file_path} does not exist"
 
         # verify that the metadata is overrode
-        tmp_metadata, error = gcs_upload.validate_and_load(tmp_metadata_file_path, [], validator_opts=ValidatorOptions(docs_path=DOCS_PATH))
+        tmp_metadata, error = validate_and_load(tmp_metadata_file_path, [], validator_opts=ValidatorOptions(docs_path=DOCS_PATH))
         tmp_metadata_dict = to_json_sanitized_dict(tmp_metadata, exclude_none=True)
         assert tmp_metadata_dict["data"]["dockerImageTag"] == prerelease_image_tag
         for registry in get(tmp_metadata_dict, "data.registryOverrides", {}).values():